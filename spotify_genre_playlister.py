@@ -18,20 +18,35 @@ Other behavior matches previous version.
 """
 
 import argparse
+import functools
+import itertools
 import os
+import random
 import sys
 import time
 import csv
 import re
 import json
+import sqlite3
 import logging
-from typing import Dict, List, Optional, Tuple
-from collections import defaultdict, Counter
+import threading
+import multiprocessing
+from typing import Dict, List, Optional, Set, Tuple
+from collections import defaultdict, deque, Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import orjson  # optional: pip install orjson
+except ImportError:
+    orjson = None
+
 import spotipy
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 
 # Suppress spotipy's HTTP error logging for cleaner output
@@ -50,9 +65,35 @@ WEIGHTS_SOURCE = {
     "musicbrainz": 0.5,
     "name_signal": 0.8
 }
-
-# Cache TTL (14 days)
-CACHE_TTL = 60 * 60 * 24 * 14
+# Bound once for the per-track scoring functions
+W_SPOTIFY = WEIGHTS_SOURCE["spotify_artist"]
+W_ALIAS = WEIGHTS_SOURCE["alias"]
+W_RELATED = WEIGHTS_SOURCE["spotify_related"]
+W_MUSICBRAINZ = WEIGHTS_SOURCE["musicbrainz"]
+W_NAME_SIGNAL = WEIGHTS_SOURCE["name_signal"]
+
+# Cache TTLs by entry source: artists with no genres are retried sooner (7 days) than hits (30 days).
+# MusicBrainz MBIDs and tags hardly ever change, so those entries keep for 180 days.
+# Sources without their own entry ("search", "album", "playlist") follow the "spotify" hit TTL.
+# main() overrides "spotify" and "empty" from --cache-ttl-hit / --cache-ttl-empty.
+CACHE_TTL_HIT = 60 * 60 * 24 * 30
+CACHE_TTL_EMPTY = 60 * 60 * 24 * 7
+CACHE_TTL_MB = 60 * 60 * 24 * 180
+CACHE_TTLS = {"spotify": CACHE_TTL_HIT, "empty": CACHE_TTL_EMPTY, "musicbrainz": CACHE_TTL_MB}
+# How long the playlist cache's name -> id map stands in for listing every playlist (--playlist-list-ttl)
+PLAYLIST_LIST_TTL = 60 * 60
+
+# 429 backoff: honour Retry-After, else exponential from 1s capped at 64s
+RETRY_MAX_TRIES = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 64.0
+
+# Client-side pacing for Spotify calls. Spotify doesn't publish its quota (a rolling
+# 30 second window), so the budget stays conservative and adapts after any 429.
+SPOTIFY_RATE_WINDOW = 30.0
+SPOTIFY_RATE_MAX = 150
+# Pooled keep-alive connections to the Spotify API (bucket and page fetches can nest thread pools)
+SPOTIFY_POOL_SIZE = 32
 
 # Artist aliases for common "unknown" cases
 ALIAS_GENRES = {
@@ -156,35 +197,47 @@ DEFAULT_BUCKET_RULES = [
     ("comedy", ["comedy"]),
 ]
 
-GENERIC_TAGS = set([
+# One genre-report row per track (also the CSV column order)
+TrackRow = namedtuple("TrackRow", "track_id track_name album artist_names primary_artist_id genres_raw bucket")
+# One --export-analysis row (ARTIST, ALBUM, TRACK or separator), in CSV column order
+AnalysisRow = namedtuple("AnalysisRow", "type artist album track_name genres_raw most_common_bucket bucket_distribution track_count")
+
+# Already in norm() form so membership checks need no extra .lower()
+GENERIC_TAGS = frozenset([
     "seen live","favorite","favorites","best","awesome","good","great",
     "all","american","british","canadian","uk","usa","united states"
 ])
 
+# Spelling variants folded together by normalize_genre (keys are norm() output)
+GENRE_REPLACEMENTS = {
+    "hip hop": "hip-hop",
+    "r&b": "rnb",
+    "alt rock": "alternative rock",
+    "alt-rock": "alternative rock",
+    "synth pop": "synthpop",
+    "indie pop": "indie-pop",
+    "indie rock": "indie-rock",
+    "electro pop": "electropop",
+    "drum and bass": "drum & bass",
+    "dnb": "drum & bass",
+    "edm": "electronic",
+    "emo pop": "emo-pop",
+    "pop punk": "pop-punk",
+}
+
+_SEP_TRANS = str.maketrans("/_", "  ")
+_WS_RE = re.compile(r"\s+")
+# Bare ID, spotify:playlist:<id> URI, or .../playlist/<id> URL (locale prefixes and query strings are ignored)
+_PLAYLIST_RE = re.compile(r"(?:^|playlist[:/])([A-Za-z0-9]{22})(?![A-Za-z0-9])")
+
 def norm(s: str) -> str:
-    s = (s or "").strip().lower()
-    s = re.sub(r"[/_]", " ", s)
-    s = re.sub(r"\s+", " ", s)
-    return s
+    return _WS_RE.sub(" ", (s or "").strip().lower().translate(_SEP_TRANS))
 
+# The genre vocabulary is small and repeats across artists/tracks, so memoize
+@functools.lru_cache(maxsize=8192)
 def normalize_genre(g: str) -> str:
     g = norm(g)
-    replacements = {
-        "hip hop": "hip-hop",
-        "r&b": "rnb",
-        "alt rock": "alternative rock",
-        "alt-rock": "alternative rock",
-        "synth pop": "synthpop",
-        "indie pop": "indie-pop",
-        "indie rock": "indie-rock",
-        "electro pop": "electropop",
-        "drum and bass": "drum & bass",
-        "dnb": "drum & bass",
-        "edm": "electronic",
-        "emo pop": "emo-pop",
-        "pop punk": "pop-punk",
-    }
-    return replacements.get(g, g)
+    return GENRE_REPLACEMENTS.get(g, g)
 
 def bucketize(genres: List[str], rules=DEFAULT_BUCKET_RULES, default="other") -> str:
     gset = [normalize_genre(g) for g in genres if g and norm(g) not in GENERIC_TAGS]
@@ -198,15 +251,159 @@ def bucketize(genres: List[str], rules=DEFAULT_BUCKET_RULES, default="other") ->
     return default
 
 def split_artists(artists) -> List[Tuple[str, str]]:
-    out = []
-    for a in artists or []:
-        if a and a.get("id"):
-            out.append( (a["id"], a.get("name","")) )
-    return out
+    return [(a["id"], a.get("name", "")) for a in artists or [] if a and a.get("id")]
+
+def json_loads(data):
+    """Parse JSON bytes/str, with orjson when it is installed"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj) -> bytes:
+    """Compact UTF-8 JSON bytes, with orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 def chunked(seq, size):
-    for i in range(0, len(seq), size):
-        yield seq[i:i+size]
+    """Iterate over lists of up to size items taken from any iterable (lists, sets, generators)"""
+    it = iter(seq)
+    return iter(lambda: list(itertools.islice(it, size)), [])
+
+def parallel_imap(fn, items, workers: int = 1):
+    """Lazily map fn over items on a thread pool (the lookups are I/O-bound), yielding results in order"""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as ex:
+        yield from ex.map(fn, items)
+
+def parallel_map(fn, items, workers: int = 1) -> list:
+    """Map fn over items on a thread pool, preserving order"""
+    return list(parallel_imap(fn, items, workers))
+
+def run_batches(fn, ids: list, size: int, workers: int = 1) -> List[Tuple[list, Optional[Exception]]]:
+    """Call fn on each size-item batch of ids on a thread pool; returns (batch, error) pairs in order"""
+    def run(batch):
+        try:
+            fn(batch)
+            return batch, None
+        except Exception as e:
+            return batch, e
+    return parallel_map(run, list(chunked(ids, size)), workers)
+
+def spotify_call(fn, *args, **kwargs):
+    """Call a spotipy method, backing off and retrying on HTTP 429.
+
+    Waits Retry-After when the response has one, else a jittered exponential delay
+    so concurrent workers don't retry in lockstep.
+    """
+    for attempt in range(RETRY_MAX_TRIES):
+        try:
+            return fn(*args, **kwargs)
+        except SpotifyException as e:
+            if e.http_status != 429 or attempt == RETRY_MAX_TRIES - 1:
+                raise
+            retry_after = (e.headers or {}).get("Retry-After")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(min(delay, RETRY_MAX_DELAY))
+
+class WindowRateLimiter:
+    """Allows at most max_requests calls per rolling window, shared across threads.
+
+    A 429 halves the budget (once per window, so a burst of 429s from concurrent workers
+    counts as one) and pauses every caller for Retry-After; after a quiet minute the
+    budget doubles back towards max_requests. max_requests <= 0 disables it.
+    """
+    def __init__(self, max_requests: int, window: float):
+        self.max_requests = max_requests
+        self.window = window
+        self._limit = max_requests
+        self._calls = deque()
+        self._paused_until = 0.0
+        self._last_429 = 0.0
+        self._last_halved = float("-inf")
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.max_requests <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._limit < self.max_requests and now - self._last_429 > 60:
+                    self._limit = min(self.max_requests, self._limit * 2)
+                    self._last_429 = now
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if len(self._calls) < self._limit:
+                        self._calls.append(now)
+                        return
+                    wait = self.window - (now - self._calls[0])
+            time.sleep(wait)
+
+    def set_max_requests(self, max_requests: int) -> None:
+        with self._lock:
+            self.max_requests = self._limit = max_requests
+
+    def backoff(self, retry_after: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_halved >= self.window:
+                self._limit = max(1, self._limit // 2)
+                self._last_halved = now
+            self._last_429 = now
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+SPOTIFY_LIMITER = WindowRateLimiter(SPOTIFY_RATE_MAX, SPOTIFY_RATE_WINDOW)
+
+def _orjson_response_hook(r, *args, **kwargs):
+    """requests response hook: make r.json() decode with orjson (its errors are ValueErrors, like json's)"""
+    r.json = lambda **kw: orjson.loads(r.content)
+    return r
+
+class PacedSpotify(spotipy.Spotify):
+    """spotipy client whose every API request passes through SPOTIFY_LIMITER"""
+    def _build_session(self):
+        super()._build_session()
+        # spotipy's adapter keeps 10 connections; size the pool for the worker threads so their
+        # keep-alive connections are reused instead of discarded (same urllib3 Retry policy)
+        adapter = HTTPAdapter(pool_maxsize=SPOTIFY_POOL_SIZE,
+                              max_retries=self._session.get_adapter("https://").max_retries)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if orjson:
+            self._session.hooks["response"].append(_orjson_response_hook)
+
+    def _internal_call(self, method, url, payload, params):
+        SPOTIFY_LIMITER.acquire()
+        try:
+            return super()._internal_call(method, url, payload, params)
+        except SpotifyException as e:
+            if e.http_status == 429:
+                retry_after = (e.headers or {}).get("Retry-After")
+                try:
+                    SPOTIFY_LIMITER.backoff(float(retry_after))
+                except (TypeError, ValueError):
+                    SPOTIFY_LIMITER.backoff(RETRY_BASE_DELAY)
+            raise
+
+# Lookup failures by category, summarized at the end of main() instead of printed as they happen
+API_ERRORS = defaultdict(list)
+
+# One scan per message: a 404 anywhere (checked by the anchored lookahead) outranks "not found"
+_ERROR_KIND_RE = re.compile(r"(?s)(?P<http404>^(?=.*404))|(?i:not found)")
+
+def error_kind(error: str) -> str:
+    """Summary category for an API_ERRORS message"""
+    m = _ERROR_KIND_RE.search(error)
+    if not m:
+        return "Other API Error"
+    return "404 Not Found" if m.group("http404") is not None else "Artist Not Found"
 
 def get_artist_genres_by_id(sp: spotipy.Spotify, artist_id: str) -> List[str]:
     try:
@@ -214,10 +411,7 @@ def get_artist_genres_by_id(sp: spotipy.Spotify, artist_id: str) -> List[str]:
         return [normalize_genre(g) for g in a.get("genres", [])]
     except Exception as e:
         # Log the error for summary but don't print immediately
-        if hasattr(get_artist_genres_by_id, '_errors'):
-            get_artist_genres_by_id._errors.append(f"Artist ID {artist_id}: {str(e)}")
-        else:
-            get_artist_genres_by_id._errors = [f"Artist ID {artist_id}: {str(e)}"]
+        API_ERRORS["artist"].append(f"Artist ID {artist_id}: {str(e)}")
         return []
 
 def search_artist_genres_by_name(sp: spotipy.Spotify, name: str, market: Optional[str] = None) -> List[str]:
@@ -226,88 +420,244 @@ def search_artist_genres_by_name(sp: spotipy.Spotify, name: str, market: Optiona
         artist = search_artist_best(sp, name, market)
         if not artist:
             # Log for summary
-            if hasattr(search_artist_genres_by_name, '_errors'):
-                search_artist_genres_by_name._errors.append(f"Artist name not found: {name}")
-            else:
-                search_artist_genres_by_name._errors = [f"Artist name not found: {name}"]
+            API_ERRORS["artist_search"].append(f"Artist name not found: {name}")
             return []
         return [normalize_genre(g) for g in artist.get("genres", [])]
     except Exception as e:
-        if hasattr(search_artist_genres_by_name, '_errors'):
-            search_artist_genres_by_name._errors.append(f"Artist name search {name}: {str(e)}")
-        else:
-            search_artist_genres_by_name._errors = [f"Artist name search {name}: {str(e)}"]
+        API_ERRORS["artist_search"].append(f"Artist name search {name}: {str(e)}")
         return []
 
 def infer_from_related(sp: spotipy.Spotify, artist_id: str) -> List[str]:
     try:
-        rel = sp.artist_related_artists(artist_id).get("artists", [])
-        genres = []
-        for a in rel[:10]:
-            genres.extend(a.get("genres", []))
-        genres = [normalize_genre(g) for g in genres]
-        common = [g for g, _ in Counter(genres).most_common(3)]
-        return common
+        # spotify_call retries 429s; one that outlasts the retries is logged below like any other failure
+        rel = spotify_call(sp.artist_related_artists, artist_id).get("artists", [])
+        counts = Counter(normalize_genre(g) for a in rel[:10] for g in a.get("genres", []))
+        # most_common(n) is a heapq.nlargest partial selection, not a full sort
+        return [g for g, _ in counts.most_common(3)]
     except Exception as e:
         # Log for summary
-        if hasattr(infer_from_related, '_errors'):
-            infer_from_related._errors.append(f"Related artists for {artist_id}: {str(e)}")
-        else:
-            infer_from_related._errors = [f"Related artists for {artist_id}: {str(e)}"]
+        API_ERRORS["related"].append(f"Related artists for {artist_id}: {str(e)}")
         return []
 
 MB_HEADERS = {"User-Agent": "GenreFiller/2.0 ( https://example.com )"}
 
-def mb_search_artist(name: str) -> Optional[str]:
+class RateLimiter:
+    """Spaces calls at least min_gap seconds apart, sleeping only for the part of the gap not already elapsed"""
+    def __init__(self, min_gap: float):
+        self.min_gap = min_gap
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next:
+                time.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.min_gap
+
+# MusicBrainz allows ~1 req/s; main() sets the gap from --mb-delay
+MB_LIMITER = RateLimiter(1.1)
+# More lookup threads than this would only queue on MB_LIMITER
+MB_WORKERS = 4
+
+# Shared session so MusicBrainz calls reuse the pooled TLS connection
+MB_SESSION = requests.Session()
+MB_SESSION.headers.update(MB_HEADERS)
+MB_SESSION.headers.update({"Accept-Encoding": "gzip"})
+MB_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], respect_retry_after_header=True),
+))
+
+# Returned by the MusicBrainz helpers when the request itself failed, as opposed to a real "not found",
+# so the caller can skip caching it and try again next run
+MB_FAILED = object()
+
+def mb_search_artist(name: str):
+    """Best-scoring MBID for a name, None if MusicBrainz has no match, MB_FAILED if the request failed"""
     try:
         url = "https://musicbrainz.org/ws/2/artist/"
         params = {"query": name, "fmt": "json"}
-        r = requests.get(url, params=params, headers=MB_HEADERS, timeout=15)
+        MB_LIMITER.wait()
+        r = MB_SESSION.get(url, params=params, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = json_loads(r.content)
         artists = data.get("artists", [])
         if not artists:
             return None
         artists.sort(key=lambda a: a.get("score", 0), reverse=True)
         return artists[0].get("id")
     except Exception:
-        return None
+        return MB_FAILED
 
-def mb_artist_genres(mbid: str) -> List[str]:
+def mb_artist_genres(mbid: str):
+    """Non-generic tags for an MBID, or MB_FAILED if the request failed"""
     try:
         url = f"https://musicbrainz.org/ws/2/artist/{mbid}"
         params = {"inc": "tags", "fmt": "json"}
-        r = requests.get(url, params=params, headers=MB_HEADERS, timeout=15)
+        MB_LIMITER.wait()
+        r = MB_SESSION.get(url, params=params, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = json_loads(r.content)
         tags = data.get("tags", []) or []
         names = [t.get("name","") for t in tags if isinstance(t, dict)]
         names = [normalize_genre(n) for n in names if n and n.lower() not in GENERIC_TAGS]
         return names
     except Exception:
-        return []
-
-def load_cache(path: str) -> Dict[str, dict]:
-    """Load cache with TTL structure"""
+        return MB_FAILED
+
+def source_ttl(source: str) -> float:
+    """TTL for entries from source; sources without their own TTL use the "spotify" hit TTL"""
+    return CACHE_TTLS.get(source, CACHE_TTLS["spotify"])
+
+def entry_source(ent: dict) -> str:
+    """Source of a cache entry; entries from older versions without one count as Spotify hits or misses"""
+    return ent.get("source") or ("spotify" if ent.get("genres") else "empty")
+
+def cache_ttl(ent: dict) -> float:
+    """TTL for a cache entry based on its source ("spotify", "empty", ...)"""
+    return source_ttl(entry_source(ent))
+
+def cache_expired(ent: dict, now: Optional[float] = None) -> bool:
+    now = time.time() if now is None else now
+    return (now - ent.get("ts", 0)) > cache_ttl(ent)
+
+class SqliteCache:
+    """Dict-like cache of {key: entry} stored in SQLite, so runs read and write single rows.
+
+    Entries keep the JSON-file shape ({"genres"/"mbid", "ts", "source"}), which lets
+    cache_get/cache_put and the MusicBrainz helpers use it exactly like a dict.
+    Writes are batched into transactions of commit_every rows, so a crash loses at most
+    one batch; save_cache commits the remainder.
+    The connection only works on the thread that opened it (sqlite3's check_same_thread), so
+    cache reads and writes stay on the main thread and only network calls go to worker pools.
+    """
+    commit_every = 500
+    _UPSERT = "INSERT OR REPLACE INTO cache (key, value, source, ts) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.pending = 0
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, source TEXT, ts REAL)")
+        self.conn.commit()
+
+    def get(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return json_loads(row[0]) if row else default
+
+    def __getitem__(self, key: str):
+        ent = self.get(key)
+        if ent is None:
+            raise KeyError(key)
+        return ent
+
+    @staticmethod
+    def _row(key: str, ent) -> tuple:
+        source = entry_source(ent) if isinstance(ent, dict) else None
+        ts = ent.get("ts") if isinstance(ent, dict) else None
+        return key, json_dumps(ent).decode("utf-8"), source, ts
+
+    def __setitem__(self, key: str, ent) -> None:
+        self.conn.execute(self._UPSERT, self._row(key, ent))
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def get_many(self, keys) -> Dict[str, dict]:
+        """{key: entry} for the keys present, fetched in IN (...) batches"""
+        out = {}
+        for chunk in chunked(keys, 500):
+            marks = ",".join("?" * len(chunk))
+            for key, value in self.conn.execute(f"SELECT key, value FROM cache WHERE key IN ({marks})", chunk):
+                out[key] = json_loads(value)
+        return out
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def update(self, entries: Dict[str, dict]) -> None:
+        self.conn.executemany(self._UPSERT, (self._row(k, v) for k, v in entries.items()))
+        self.commit()
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Delete entries past their per-source TTL"""
+        now = time.time() if now is None else now
+        sources = [r[0] for r in self.conn.execute("SELECT DISTINCT source FROM cache WHERE source IS NOT NULL")]
+        for source in sources:
+            self.conn.execute("DELETE FROM cache WHERE source = ? AND ts < ?",
+                              (source, now - source_ttl(source)))
+        # Rows seeded before sources were recorded fall under the default (hit) TTL; rows without
+        # a ts are old list-format entries, which count as expired anyway
+        self.conn.execute("DELETE FROM cache WHERE source IS NULL AND (ts IS NULL OR ts < ?)",
+                          (now - source_ttl("spotify"),))
+        self.conn.commit()
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self.pending = 0
+
+def load_json_cache(path: str) -> Dict[str, dict]:
+    """Load a JSON cache file with TTL structure, dropping expired entries"""
     if not path or not os.path.exists(path):
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            cache = json_loads(f.read())
     except Exception:
         return {}
-
-def save_cache(cache: Dict[str, dict], path: str) -> None:
-    """Save cache with TTL structure"""
+    now = time.time()
+    return {k: v for k, v in cache.items() if not (isinstance(v, dict) and cache_expired(v, now))}
+
+def load_cache(path: str):
+    """Open the artist cache: SQLite by default, or a JSON file when path ends in .json.
+
+    A new SQLite cache is seeded from a JSON cache of the same name, if one exists.
+    """
+    if path.endswith(".json"):
+        return load_json_cache(path)
+    is_new = not os.path.exists(path)
+    cache = SqliteCache(path)
+    if is_new:
+        cache.update(load_json_cache(os.path.splitext(path)[0] + ".json"))
+    cache.prune()
+    return cache
+
+def save_cache(cache, path: str) -> None:
+    """Save cache with TTL structure (commits pending rows for a SQLite cache)"""
+    if isinstance(cache, SqliteCache):
+        cache.commit()
+        return
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
+        with open(path, "wb") as f:
+            f.write(json_dumps(cache))
     except Exception:
         pass
 
 def cache_get(cache: Dict[str, dict], aid: str) -> Optional[List[str]]:
-    """Get genres from cache if not expired"""
-    ent = cache.get(aid)
+    """Get genres from cache if not expired (an empty list is a cached negative result)"""
+    return entry_genres(cache, aid, cache.get(aid))
+
+def cache_get_many(cache: Dict[str, dict], aids) -> Dict[str, List[str]]:
+    """cache_get for many IDs with one lookup per batch; misses and expired entries are left out"""
+    aids = list(aids)
+    if isinstance(cache, SqliteCache):
+        entries = cache.get_many(aids)
+    else:
+        entries = {aid: cache[aid] for aid in aids if aid in cache}
+    out = {}
+    for aid, ent in entries.items():
+        genres = entry_genres(cache, aid, ent)
+        if genres is not None:
+            out[aid] = genres
+    return out
+
+def entry_genres(cache: Dict[str, dict], aid: str, ent) -> Optional[List[str]]:
     if not ent:
         return None
     
@@ -317,81 +667,169 @@ def cache_get(cache: Dict[str, dict], aid: str) -> Optional[List[str]]:
         cache_put(cache, aid, ent)
         return None  # Force refresh for old entries
     
-    if (time.time() - ent.get("ts", 0)) > CACHE_TTL:
+    if cache_expired(ent):
         return None
     return ent.get("genres", [])
 
-def cache_put(cache: Dict[str, dict], aid: str, genres: List[str]) -> None:
-    """Put genres in cache with current timestamp"""
-    cache[aid] = {"genres": genres, "ts": time.time()}
+def cache_put(cache: Dict[str, dict], aid: str, genres: List[str], source: str = "spotify") -> None:
+    """Put genres in cache with current timestamp and source (empty results get the short TTL)"""
+    cache[aid] = {"genres": genres, "ts": time.time(), "source": source if genres else "empty"}
 
-def get_genres_for_artist_ids(sp: spotipy.Spotify, artist_ids: List[str]) -> Dict[str, List[str]]:
-    """Batch fetch artist genres (50 at a time)"""
-    out = {}
-    for chunk in chunked(artist_ids, 50):
+def mb_genres_for_name(cache: Dict[str, dict], name: str) -> List[str]:
+    """MusicBrainz genres for an artist name, caching name -> mbid and mbid -> genres alongside artist entries"""
+    name_key = "mb_name:" + norm(name)
+    ent = cache.get(name_key)
+    if isinstance(ent, dict) and not cache_expired(ent):
+        mbid = ent.get("mbid")
+    else:
+        mbid = mb_search_artist(name)
+        if mbid is MB_FAILED:
+            return []  # not cached, so a flaky request doesn't hide the artist for the whole TTL
+        cache[name_key] = {"mbid": mbid, "ts": time.time(), "source": "musicbrainz" if mbid else "empty"}
+    if not mbid:
+        return []
+
+    genres = cache_get(cache, "mb_id:" + mbid)
+    if genres is None:
+        genres = mb_artist_genres(mbid)
+        if genres is MB_FAILED:
+            return []
+        cache_put(cache, "mb_id:" + mbid, genres, source="musicbrainz")
+    return genres
+
+def prefetch_musicbrainz(cache: Dict[str, dict], names: List[str], workers: int = 1) -> int:
+    """Look up uncached artist names on MusicBrainz concurrently (still paced by MB_LIMITER); returns how many"""
+    now = time.time()
+    todo = {}
+    for name in names:
+        name_key = "mb_name:" + norm(name)
+        ent = cache.get(name_key)
+        if not (isinstance(ent, dict) and not cache_expired(ent, now)):
+            todo.setdefault(name_key, name)
+    mbids = parallel_map(mb_search_artist, list(todo.values()), workers)
+    for name_key, mbid in zip(todo, mbids):
+        if mbid is MB_FAILED:
+            continue  # left uncached so it's retried rather than remembered as a miss
+        cache[name_key] = {"mbid": mbid, "ts": time.time(), "source": "musicbrainz" if mbid else "empty"}
+
+    need = [m for m in dict.fromkeys(mbids) if m and m is not MB_FAILED and cache_get(cache, "mb_id:" + m) is None]
+    for mbid, genres in zip(need, parallel_map(mb_artist_genres, need, workers)):
+        if genres is MB_FAILED:
+            continue
+        cache_put(cache, "mb_id:" + mbid, genres, source="musicbrainz")
+    return len(todo)
+
+def get_genres_for_artist_ids(sp: spotipy.Spotify, artist_ids: List[str], workers: int = 1) -> Dict[str, List[str]]:
+    """Batch fetch artist genres (50 at a time, chunks fetched concurrently).
+
+    IDs from a chunk whose request failed are left out, so callers don't cache them as genre-less.
+    """
+    def fetch(chunk):
+        # 429s are retried by spotify_call and 5xx by the session's urllib3 Retry; None marks a chunk that still failed
         try:
-            res = sp.artists(chunk).get("artists", [])
-            for a in res:
-                out[a["id"]] = [normalize_genre(g) for g in a.get("genres", [])]
+            return spotify_call(sp.artists, chunk).get("artists", [])
         except Exception as e:
-            # retry once with small sleep
-            time.sleep(0.5)
-            try:
-                res = sp.artists(chunk).get("artists", [])
-                for a in res:
-                    out[a["id"]] = [normalize_genre(g) for g in a.get("genres", [])]
-            except Exception:
-                for aid in chunk:
-                    out.setdefault(aid, [])
+            API_ERRORS["artist"].append(f"Artist batch of {len(chunk)} starting {chunk[0]}: {str(e)}")
+            return None
+
+    chunks = list(chunked(artist_ids, 50))
+    out = {}
+    for chunk, res in zip(chunks, parallel_map(fetch, chunks, workers)):
+        if res is None:
+            continue
+        for a in res:
+            if a and a.get("id"):
+                out[a["id"]] = [normalize_genre(g) for g in a.get("genres", [])]
+        # Unknown/removed IDs come back as null; record them as empty so they aren't re-queried
+        for aid in chunk:
+            out.setdefault(aid, [])
     return out
 
-def weighted_genres_for_track(sp: spotipy.Spotify, track: dict, cache: Dict[str, dict]) -> List[Tuple[str, float]]:
-    """Get weighted genres for track artists"""
+def track_artist_ids(track: dict, use_all_artists: bool = True) -> List[str]:
+    """Artist IDs for a track (primary only unless use_all_artists)"""
+    ids = [a.get("id") for a in track.get("artists", []) or [] if a.get("id")]
+    return ids if use_all_artists else ids[:1]
+
+def primary_is_sufficient(track: dict, artist_genres: Dict[str, List[str]]) -> bool:
+    """True when the primary artist's genres alone already pick a bucket (anything but "other")"""
+    artists = track.get("artists") or []
+    aid = artists[0].get("id") if artists else None
+    return bool(aid) and bucketize_scored([(g, 1.0) for g in artist_genres.get(aid, ())]) != "other"
+
+def prefetch_artist_genres(sp: spotipy.Spotify, tracks: List[dict], cache: Dict[str, dict], use_all_artists: bool = True, workers: int = 1,
+                           primary_sufficient: bool = False) -> Tuple[Dict[str, List[str]], int]:
+    """Resolve every distinct artist across tracks in one batched pass.
+
+    Uncached IDs are fetched 50 per call and written to the cache. Returns
+    ({artist_id: genres}, number_fetched) so per-track scoring is plain dict lookups.
+    With primary_sufficient, primaries are resolved first and collaborators only
+    for tracks whose primary artist doesn't already decide the bucket.
+    """
+    artist_genres = {}
+
+    def resolve(ids) -> int:
+        todo = [aid for aid in dict.fromkeys(ids) if aid not in artist_genres]
+        hits = cache_get_many(cache, todo)
+        artist_genres.update(hits)
+        missing = [aid for aid in todo if aid not in hits]
+        if missing:
+            for aid, genres in get_genres_for_artist_ids(sp, missing, workers).items():
+                cache_put(cache, aid, genres)
+                artist_genres[aid] = genres
+        return len(missing)
+
+    if not (use_all_artists and primary_sufficient):
+        return artist_genres, resolve(aid for tr in tracks for aid in track_artist_ids(tr, use_all_artists))
+
+    fetched = resolve(aid for tr in tracks for aid in track_artist_ids(tr, False))
+    fetched += resolve(aid for tr in tracks if not primary_is_sufficient(tr, artist_genres)
+                       for aid in track_artist_ids(tr))
+    return artist_genres, fetched
+
+def weighted_genres_for_track(track: dict, artist_genres: Dict[str, List[str]], use_all_artists: bool = True,
+                              primary_sufficient: bool = False) -> Counter:
+    """Get {genre: weight} for track artists from a prefetched {artist_id: genres} map (no network)"""
     artists = track.get("artists", []) or []
+    if not use_all_artists or (primary_sufficient and primary_is_sufficient(track, artist_genres)):
+        artists = artists[:1]
+    scores = Counter()
     if not artists:
-        return []
-
-    ids = [a.get("id") for a in artists if a.get("id")]
-    
-    # Get from cache or batch pull as needed
-    missing = [aid for aid in ids if aid and cache_get(cache, aid) is None]
-    if missing:
-        batch_results = get_genres_for_artist_ids(sp, missing)
-        for aid, genres in batch_results.items():
-            cache_put(cache, aid, genres)
+        return scores
 
-    scores = Counter()
+    primary_w, featured_w = ARTIST_WEIGHTS["primary"], ARTIST_WEIGHTS["featured"]
     for i, a in enumerate(artists):
         aid = a.get("id")
-        if not aid:
-            continue
-        role = "primary" if (i == 0) else "featured"
-        w = ARTIST_WEIGHTS[role]
-        genres = cache_get(cache, aid) or []
-        for g in genres:
-            scores[g] += w
+        if aid:
+            w = featured_w if i else primary_w
+            for g in artist_genres.get(aid, ()):
+                scores[g] += w
 
-    # return [(genre, score)...] sorted
-    return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    # unsorted: callers only accumulate these, the final ranking is rank_scores()
+    return scores
 
 def genres_from_alias(artist_name: str) -> List[str]:
     """Get genres from alias table"""
     return [normalize_genre(g) for g in ALIAS_GENRES.get(artist_name, [])]
 
+_MUSICAL_CUES = ("original broadway cast", "cast company", "broadway")
+_CLASSICAL_CUES = ("orchestra", "symphony", "philharmonic")
+_COMPOSERS = frozenset(["debussy", "rachmaninov", "mozart", "beethoven", "vivaldi", "bocelli", "einaudi", "yiruma"])
+_WORD_RE = re.compile(r"\w+")
+
 def name_signal_genres(artist_name: str) -> List[str]:
     """Get genres from name signals (fast rules)"""
     a = artist_name.lower()
-    if any(tok in a for tok in ["original broadway cast", "cast company", "broadway"]):
+    if any(tok in a for tok in _MUSICAL_CUES):
         return ["musicals"]
-    if any(tok in a for tok in ["orchestra", "symphony", "philharmonic"]) or \
-       re.search(r"\b(debussy|rachmaninov|mozart|beethoven|vivaldi|bocelli|einaudi|yiruma)\b", a):
+    # cues are substrings ("orchestral" counts); composers must be whole words
+    if any(tok in a for tok in _CLASSICAL_CUES) or not _COMPOSERS.isdisjoint(_WORD_RE.findall(a)):
         return ["classical"]
     return []
 
 def add_weighted(scores: Counter, genres: List[str], weight: float) -> None:
-    """Add weighted genres to counter"""
+    """Add weighted genres to counter (genres are already normalized by every source)"""
     for g in genres:
-        scores[normalize_genre(g)] += weight
+        scores[g] += weight
 
 def search_artist_best(sp: spotipy.Spotify, name: str, market: Optional[str] = None) -> Optional[dict]:
     """Search for best artist match with market preference and popularity"""
@@ -405,6 +843,10 @@ def search_artist_best(sp: spotipy.Spotify, name: str, market: Optional[str] = N
     except Exception:
         return None
 
+# deterministic tie-break with your 6 preferred buckets first
+BUCKET_ORDER = ["rock", "country", "hip-hop", "classical", "musical", "electronic", "other"]
+_BUCKET_RANK = {b: i for i, b in enumerate(BUCKET_ORDER)}
+
 def bucketize_scored(weighted_genres: List[Tuple[str, float]]) -> str:
     """Score-based bucketizer instead of first substring match"""
     bucket_scores = Counter()
@@ -416,74 +858,227 @@ def bucketize_scored(weighted_genres: List[Tuple[str, float]]) -> str:
     if not bucket_scores:
         return "other"
     
-    # deterministic tie-break with your 6 preferred buckets first
-    order = ["rock", "country", "hip-hop", "classical", "musical", "electronic", "other"]
-    top = sorted(bucket_scores.items(), key=lambda kv: (-kv[1], order.index(kv[0]) if kv[0] in order else 999))[0][0]
-    return top
-
-def paginate_saved_tracks(sp, limit=50, max_items=0):
-    """Paginate through saved tracks"""
-    offset = 0
+    return min(bucket_scores.items(), key=lambda kv: (-kv[1], _BUCKET_RANK.get(kv[0], 999)))[0]
+
+def direct_genre_scores(track: dict, artist_genres: Dict[str, List[str]], use_all_artists: bool = True,
+                        primary_sufficient: bool = False) -> Counter:
+    """Genre scores from prefetched Spotify genres, aliases and name signals (no network)"""
+    scores = Counter()
+
+    # 1) Spotify direct (weighted by primary/featured), from the prefetched artist map
+    w = weighted_genres_for_track(track, artist_genres, use_all_artists, primary_sufficient)   # {genre: score}
+    for g, s in w.items():
+        scores[g] += W_SPOTIFY * s
+
+    if not scores:
+        # 2) alias by name
+        for a in track.get("artists", []):
+            add_weighted(scores, genres_from_alias(a.get("name", "")), W_ALIAS)
+
+    if not scores:
+        # 3) name signals
+        for a in track.get("artists", []):
+            add_weighted(scores, name_signal_genres(a.get("name", "")), W_NAME_SIGNAL)
+
+    return scores
+
+def track_genre_scores(track: dict, artist_genres: Dict[str, List[str]], related: Dict[str, List[str]], use_all_artists: bool = True,
+                       primary_sufficient: bool = False) -> Counter:
+    """Direct scores, falling back to prefetched related-artist genres for the primary artist"""
+    scores = direct_genre_scores(track, artist_genres, use_all_artists, primary_sufficient)
+    if not scores and related:
+        # 4) related artists (primary only), resolved concurrently up front
+        primary_id = track.get("artists", [{}])[0].get("id")
+        if primary_id:
+            add_weighted(scores, related.get(primary_id, []), W_RELATED)
+    return scores
+
+# Read-only lookup tables for pool workers, set once per process by the initializer
+_WORKER_STATE = {}
+
+def _init_classify_worker(artist_genres: Dict[str, List[str]], related: Dict[str, List[str]], use_all_artists: bool,
+                          primary_sufficient: bool) -> None:
+    _WORKER_STATE.update(artist_genres=artist_genres, related=related, use_all_artists=use_all_artists,
+                         primary_sufficient=primary_sufficient)
+
+def rank_scores(scores: Counter) -> Tuple[List[Tuple[str, float]], str]:
+    """Sorted [(genre, score)] list for a track and the bucket it lands in"""
+    weighted = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    return weighted, bucketize_scored(weighted)
+
+def _classify_track_worker(track: dict) -> Tuple[List[Tuple[str, float]], str]:
+    return rank_scores(track_genre_scores(track, **_WORKER_STATE))
+
+def iter_track_classifications(tracks: List[dict], artist_genres: Dict[str, List[str]], related: Dict[str, List[str]],
+                               use_all_artists: bool = True, processes: int = 1, chunksize: int = 256,
+                               primary_sufficient: bool = False):
+    """Yield (weighted_genres, bucket) for each track in order, optionally spread over a process pool.
+
+    Scoring, sorting and bucketing all happen here, so only the MusicBrainz
+    fallback for still-empty tracks is left to the main process.
+    """
+    if processes == 0:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(tracks) <= chunksize:
+        for tr in tracks:
+            yield rank_scores(track_genre_scores(tr, artist_genres, related, use_all_artists, primary_sufficient))
+        return
+    with multiprocessing.Pool(processes, initializer=_init_classify_worker,
+                              initargs=(artist_genres, related, use_all_artists, primary_sufficient)) as pool:
+        yield from pool.imap(_classify_track_worker, tracks, chunksize=chunksize)
+
+def paginate_saved_tracks(sp, limit=50, max_items=0, workers=1):
+    """Paginate through saved tracks, following each page's next link.
+
+    With workers > 1 the first page's total is used to fetch the remaining
+    offsets concurrently; items are still yielded in library order.
+    """
     got = 0
-    while True:
-        res = sp.current_user_saved_tracks(limit=limit, offset=offset)
-        items = res.get("items", [])
-        if not items:
-            break
-        for it in items:
+    res = sp.current_user_saved_tracks(limit=limit)
+    if workers > 1 and res and res.get("next"):
+        total = res.get("total") or 0
+        if max_items:
+            total = min(total, max_items)
+        offsets = range(len(res.get("items", [])), total, limit)
+        pages = [res] + parallel_map(lambda off: sp.current_user_saved_tracks(limit=limit, offset=off), offsets, workers)
+        for page in pages:
+            for it in (page or {}).get("items", []):
+                yield it
+                got += 1
+                if max_items and got >= max_items:
+                    return
+        return
+    while res:
+        for it in res.get("items", []):
             yield it
             got += 1
             if max_items and got >= max_items:
                 return
-        offset += len(items)
+        res = sp.next(res) if res.get("next") else None
+
+def fetch_pages(fetch_page, limit: int, workers: int = 1, max_items: int = 0) -> List[dict]:
+    """Every page of an offset-paged endpoint: fetch_page(0) gives the total, the other offsets run concurrently.
+
+    max_items stops short of the total (the last page may still overshoot it).
+    """
+    first = fetch_page(0) or {}
+    total = first.get("total") or 0
+    if max_items:
+        total = min(total, max_items)
+    offsets = range(limit, total, limit)
+    return [first] + [page or {} for page in parallel_map(fetch_page, offsets, workers)]
+
+def fetch_playlist_track_ids(sp, playlist_id: str, workers: int = 1) -> set:
+    """All track IDs currently in a playlist, with pages past the first fetched concurrently"""
+    pages = fetch_pages(lambda off: sp.playlist_items(playlist_id, fields="items(track(id)),total", limit=100, offset=off),
+                        100, workers)
+    items = itertools.chain.from_iterable(page.get("items", []) for page in pages)
+    return {t["id"] for t in (it.get("track") or {} for it in items) if t.get("id")}
+
+def load_playlist_snapshots(path: str) -> Dict[str, dict]:
+    """Load {playlist_id: {"snapshot_id": ..., "track_ids": [...]}} saved by a previous run"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as f:
+            return json_loads(f.read())
+    except Exception:
+        return {}
 
-def get_artist_albums(sp, artist_id: str) -> List[dict]:
-    """Get all albums for an artist"""
+# Checks a reused playlist listing costs per bucket playlist: playlist_is_following + the snapshot_id fetch
+LISTING_CHECKS_PER_PLAYLIST = 2
+
+def cached_playlist_listing(snapshots: Dict[str, dict], owner_id: str, buckets: int, ttl: float,
+                            now: Optional[float] = None) -> Optional[dict]:
+    """The saved "owner:<id>" name -> id map if reusing it beats listing again, else None.
+
+    Relisting costs one call per page (50 playlists); reuse costs LISTING_CHECKS_PER_PLAYLIST
+    calls per bucket, so it pays off only for libraries bigger than that many pages
+    (about 700 playlists for the 7 buckets) and only within ttl seconds of the listing.
+    """
+    listing = snapshots.get(f"owner:{owner_id}")
+    now = time.time() if now is None else now
+    if (ttl > 0 and isinstance(listing, dict) and now - listing.get("ts", 0) < ttl
+            and listing.get("pages", 0) > LISTING_CHECKS_PER_PLAYLIST * buckets):
+        return listing
+    return None
+
+def album_key(album: dict) -> Tuple[str, str]:
+    """(lowercased name, release year) identity used to dedupe and match albums"""
+    return ((album.get('name') or '').lower(), (album.get('release_date') or '')[:4])
+
+def get_artist_albums(sp, artist_id: str, workers: int = 1) -> List[dict]:
+    """Get all albums for an artist (with workers > 1, pages after the first are fetched concurrently)"""
     try:
         albums = []
-        results = sp.artist_albums(artist_id, album_type='album,single', limit=50)
+        # Each page call retries its own 429s, so a rate-limited page doesn't refetch the others
+        results = spotify_call(sp.artist_albums, artist_id, album_type='album,single', limit=50)
         albums.extend(results['items'])
         
-        while results['next']:
-            results = sp.next(results)
-            albums.extend(results['items'])
+        if workers > 1 and results['next']:
+            offsets = range(len(results['items']), results.get('total') or 0, 50)
+            pages = parallel_map(lambda off: spotify_call(sp.artist_albums, artist_id, album_type='album,single', limit=50, offset=off),
+                                 offsets, workers)
+            for page in pages:
+                albums.extend(page['items'])
+        else:
+            while results['next']:
+                results = spotify_call(sp.next, results)
+                albums.extend(results['items'])
         
         # Remove duplicates (sometimes albums appear multiple times)
         seen = set()
         unique_albums = []
         for album in albums:
-            key = (album['name'].lower(), album['release_date'][:4] if album['release_date'] else '')  # Name + year
+            key = album_key(album)
             if key not in seen:
                 seen.add(key)
                 unique_albums.append(album)
         
         return unique_albums
     except Exception as e:
-        if hasattr(get_artist_albums, '_errors'):
-            get_artist_albums._errors.append(f"Artist albums {artist_id}: {str(e)}")
-        else:
-            get_artist_albums._errors = [f"Artist albums {artist_id}: {str(e)}"]
+        API_ERRORS["artist_albums"].append(f"Artist albums {artist_id}: {str(e)}")
         return []
 
 def get_album_tracks(sp, album_id: str) -> List[dict]:
     """Get all tracks from an album"""
     try:
         tracks = []
-        results = sp.album_tracks(album_id, limit=50)
+        results = spotify_call(sp.album_tracks, album_id, limit=50)
         tracks.extend(results['items'])
         
         while results['next']:
-            results = sp.next(results)
+            results = spotify_call(sp.next, results)
             tracks.extend(results['items'])
             
         return tracks
     except Exception as e:
-        if hasattr(get_album_tracks, '_errors'):
-            get_album_tracks._errors.append(f"Album tracks {album_id}: {str(e)}")
-        else:
-            get_album_tracks._errors = [f"Album tracks {album_id}: {str(e)}"]
+        API_ERRORS["album_tracks"].append(f"Album tracks {album_id}: {str(e)}")
         return []
 
+def slim_track(t: dict) -> dict:
+    """Just the track fields the reports read (id, name, artists, album name), for caching"""
+    slim = {"id": t.get("id"), "name": t.get("name", ""),
+            "artists": [{"id": a.get("id"), "name": a.get("name", "")} for a in t.get("artists", [])]}
+    if "album" in t:
+        slim["album"] = {"name": (t.get("album") or {}).get("name", "")}
+    return slim
+
+def get_album_tracks_cached(sp, album_ids: List[str], cache: Dict[str, dict], workers: int = 1) -> Dict[str, List[dict]]:
+    """{album_id: tracks}, cached under "album_tracks:<id>" with just the fields the report uses"""
+    out, missing = {}, []
+    for album_id in album_ids:
+        ent = cache.get("album_tracks:" + album_id)
+        if isinstance(ent, dict) and not cache_expired(ent):
+            out[album_id] = ent.get("tracks", [])
+        else:
+            missing.append(album_id)
+    for album_id, tracks in zip(missing, parallel_imap(lambda al: get_album_tracks(sp, al), missing, workers)):
+        out[album_id] = tracks
+        if tracks:  # an empty list may be a failed fetch, so only real track lists are kept
+            cache["album_tracks:" + album_id] = {"tracks": [slim_track(t) for t in tracks], "ts": time.time(), "source": "album"}
+    return out
+
 def search_album(sp, artist: str, album: str) -> Optional[dict]:
     """Search for a specific album by artist and album name"""
     try:
@@ -521,7 +1116,7 @@ def main():
     ap.add_argument("--prefix", default="Genres – ", help="Playlist name prefix for created/updated genre playlists")
     ap.add_argument("--owner", default="", help="Optional user ID to own the new playlists (defaults to your account)")
     ap.add_argument("--public", action="store_true", help="Create genre playlists as public (default private)")
-    ap.add_argument("--clear", action="store_true", help="Clear genre playlists before adding new tracks")
+    ap.add_argument("--clear", action="store_true", help="Rebuild genre playlists: remove tracks no longer in the bucket (unchanged tracks stay in place)")
     ap.add_argument("--dry-run", action="store_true", help="Do not create/update playlists, only print and export CSV")
     ap.add_argument("--export-analysis", action="store_true", help="Export detailed artist/album/genre analysis instead of creating playlists")
     ap.add_argument("--export-artists", action="store_true", help="Export all artists from liked songs with their albums and availability")
@@ -530,23 +1125,27 @@ def main():
     ap.add_argument("--add-albums", help="Text file with albums to add (format: 'Artist Name: Album Name' per line)")
     ap.add_argument("--favorite-artists", help="Text file with favorite artists to add all their albums (one artist per line)")
     ap.add_argument("--csv", default="genre_assignments.csv", help="CSV path to export report")
-    ap.add_argument("--cache", default="spotify_artist_genre_cache.json", help="Cache file for artist genres")
+    ap.add_argument("--cache", default="spotify_artist_genre_cache.db", help="Cache file for artist genres (SQLite; a .json path keeps the JSON format)")
+    ap.add_argument("--playlist-cache", default="playlist_snapshots.json", help="Cache of genre playlist contents keyed by snapshot_id (skips re-reading unchanged playlists)")
+    ap.add_argument("--playlist-list-ttl", type=int, default=PLAYLIST_LIST_TTL, help="Seconds to reuse the cached name -> id map of your playlists instead of listing them (0 = always list)")
+    ap.add_argument("--cache-ttl-hit", type=int, default=CACHE_TTL_HIT, help="Seconds to keep cached Spotify results: artists with genres, track searches, album and playlist tracks (default 30 days)")
+    ap.add_argument("--cache-ttl-empty", type=int, default=CACHE_TTL_EMPTY, help="Seconds to keep cached artists with no genres before retrying (default 7 days)")
     ap.add_argument("--use-all-artists", action="store_true", default=True, help="Use all artists on the track to collect genres (default: True)")
+    ap.add_argument("--primary-sufficient", action="store_true", help="Skip featured artists when the primary artist's genres already pick a bucket (fewer lookups)")
     ap.add_argument("--infer-related", action="store_true", help="If empty, infer genres from Spotify related artists")
     ap.add_argument("--use-musicbrainz", action="store_true", help="If still empty, query MusicBrainz tags")
     ap.add_argument("--mb-delay", type=float, default=1.1, help="Delay between MusicBrainz requests (seconds)")
+    ap.add_argument("--workers", type=int, default=8, help="Concurrent Spotify lookups for artist genres / related artists (1 = serial)")
+    ap.add_argument("--rate-limit", type=int, default=SPOTIFY_RATE_MAX, help=f"Max Spotify requests per {SPOTIFY_RATE_WINDOW:g}s window, shared by all workers (0 = no client-side limit)")
+    ap.add_argument("--processes", type=int, default=1, help="Worker processes for genre classification of large libraries (0 = one per CPU, 1 = in-process)")
     args = ap.parse_args()
 
-    def chunked(seq, size):
-        for i in range(0, len(seq), size):
-            yield seq[i:i+size]
+    MB_LIMITER.min_gap = args.mb_delay
+    SPOTIFY_LIMITER.set_max_requests(args.rate_limit)
+    CACHE_TTLS.update({"spotify": args.cache_ttl_hit, "empty": args.cache_ttl_empty})
 
     # Initialize error tracking
-    get_artist_genres_by_id._errors = []
-    search_artist_genres_by_name._errors = []
-    infer_from_related._errors = []
-    get_artist_albums._errors = []
-    get_album_tracks._errors = []
+    API_ERRORS.clear()
 
     client_id = os.environ.get("SPOTIPY_CLIENT_ID")
     client_secret = os.environ.get("SPOTIPY_CLIENT_SECRET")
@@ -558,13 +1157,16 @@ def main():
 
     scope = "user-library-read user-library-modify playlist-read-private playlist-modify-private playlist-modify-public"
     auth = SpotifyOAuth(client_id=client_id, client_secret=client_secret, redirect_uri=redirect_uri, scope=scope, open_browser=True, cache_path=".spotipyoauthcache")
-    sp = spotipy.Spotify(auth_manager=auth)
+    sp = PacedSpotify(auth_manager=auth)
 
     me = sp.current_user()
     user_id = me["id"]
     owner_id = args.owner or user_id
     print(f"Authed as: {me.get('display_name') or user_id} ({user_id}) -> creating playlists for owner: {owner_id}")
 
+    # One artist cache (and for SQLite, one connection) for the whole run; each mode saves it when done
+    cache = load_cache(args.cache)
+
     # Handle special export modes first
     if args.export_artists:
         if not args.liked:
@@ -573,7 +1175,7 @@ def main():
         
         print("Fetching Liked Songs...")
         liked_tracks = []
-        for item in paginate_saved_tracks(sp):
+        for item in paginate_saved_tracks(sp, workers=args.workers):
             tr = item.get("track") or {}
             if tr and tr.get("id"):
                 liked_tracks.append(tr)
@@ -583,13 +1185,9 @@ def main():
         print("Extracting unique artists...")
         
         liked_artists = {}
-        liked_albums = set()
+        liked_albums = {album_key(track["album"]) for track in liked_tracks if (track.get("album") or {}).get("name")}
         
         for track in liked_tracks:
-            album_name = (track.get("album") or {}).get("name", "")
-            if album_name:
-                liked_albums.add(album_name.lower())
-            
             for artist in track.get("artists", []):
                 artist_id = artist.get("id")
                 artist_name = artist.get("name", "")
@@ -600,44 +1198,35 @@ def main():
         print(f"Found {len(liked_artists)} unique artists")
         print("Getting albums for each artist...")
         
-        artist_data = []
-        for i, (artist_id, artist_name) in enumerate(liked_artists.items(), 1):
-            print(f"[{i}/{len(liked_artists)}] Getting albums for: {artist_name}")
-            albums = get_artist_albums(sp, artist_id)
-            
-            for album in albums:
-                album_name = album.get('name', '')
-                release_date = album.get('release_date', '')
-                total_tracks = album.get('total_tracks', 0)
-                album_type = album.get('album_type', '')
-                
-                # Check if we have this album in liked songs
-                have_album = album_name.lower() in liked_albums
+        # Album lookups are independent round-trips, so overlap them on the worker pool
+        # (results stream in order, so rows are written while later artists are still being fetched)
+        artist_albums = parallel_imap(lambda aid: get_artist_albums(sp, aid), liked_artists, args.workers)
+
+        # Rows are written per artist as they are built, not collected first
+        export_path = args.csv.replace('.csv', '_artists_albums.csv')
+        album_count = 0
+        with open(export_path, 'w', encoding='utf-8', newline='') as f:
+            fieldnames = ['artist_name', 'artist_id', 'album_name', 'album_id', 'album_type', 'release_date', 'total_tracks', 'have_in_liked']
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for i, ((artist_id, artist_name), albums) in enumerate(zip(liked_artists.items(), artist_albums), 1):
+                print(f"[{i}/{len(liked_artists)}] Got {len(albums)} albums for: {artist_name}")
                 
-                artist_data.append({
+                writer.writerows({
                     'artist_name': artist_name,
                     'artist_id': artist_id,
-                    'album_name': album_name,
+                    'album_name': album.get('name', ''),
                     'album_id': album.get('id', ''),
-                    'album_type': album_type,
-                    'release_date': release_date,
-                    'total_tracks': total_tracks,
-                    'have_in_liked': 'YES' if have_album else 'NO'
-                })
-            
-            time.sleep(0.1)  # Be nice to API
-        
-        # Export to CSV
-        export_path = args.csv.replace('.csv', '_artists_albums.csv')
-        with open(export_path, 'w', encoding='utf-8', newline='') as f:
-            if artist_data:
-                fieldnames = list(artist_data[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(artist_data)
+                    'album_type': album.get('album_type', ''),
+                    'release_date': album.get('release_date', ''),
+                    'total_tracks': album.get('total_tracks', 0),
+                    # Check if we have this album in liked songs
+                    'have_in_liked': 'YES' if album_key(album) in liked_albums else 'NO'
+                } for album in albums)
+                album_count += len(albums)
         
         print(f"Exported artist/album data: {export_path}")
-        print(f"Found {len(artist_data)} total albums from {len(liked_artists)} artists")
+        print(f"Found {album_count} total albums from {len(liked_artists)} artists")
         return
             
     elif args.export_artist_summary:
@@ -646,85 +1235,77 @@ def main():
             sys.exit(2)
         
         print("Fetching Liked Songs...")
-        liked_tracks = []
-        for item in paginate_saved_tracks(sp):
+        # Count songs per artist while paging, keeping each artist's first-seen name
+        song_counts = Counter()
+        artist_names = {}
+        liked_count = 0
+        for item in paginate_saved_tracks(sp, workers=args.workers):
             tr = item.get("track") or {}
-            if tr and tr.get("id"):
-                liked_tracks.append(tr)
-        
-        print(f"Found {len(liked_tracks)} liked tracks")
-        print("Analyzing artists...")
-        
-        artist_stats = {}
-        
-        for track in liked_tracks:
-            for artist in track.get("artists", []):
+            if not tr or not tr.get("id"):
+                continue
+            liked_count += 1
+            for artist in tr.get("artists", []):
                 artist_id = artist.get("id")
                 artist_name = artist.get("name", "")
                 if artist_id and artist_name:
-                    if artist_id not in artist_stats:
-                        artist_stats[artist_id] = {
-                            'artist_name': artist_name,
-                            'artist_id': artist_id,
-                            'song_count': 0,
-                            'genres': [],
-                            'favorite_artist': 'NO'  # User can edit this in CSV
-                        }
-                    artist_stats[artist_id]['song_count'] += 1
+                    song_counts[artist_id] += 1
+                    artist_names.setdefault(artist_id, artist_name)
         
-        print(f"Found {len(artist_stats)} unique artists")
+        print(f"Found {liked_count} liked tracks")
+        print("Analyzing artists...")
+        print(f"Found {len(song_counts)} unique artists")
         print("Getting genres for each artist (using batch processing)...")
         
         # Collect all unique artist IDs for batch processing
-        all_artist_ids = list(artist_stats.keys())
-        
-        # Batch fetch genres
-        print("Batch fetching genres from Spotify...")
-        cache = load_cache(args.cache)
-        batch_results = get_genres_for_artist_ids(sp, all_artist_ids)
+        all_artist_ids = list(song_counts)
         
-        # Update cache with results
-        for aid, genres in batch_results.items():
+        # Batch fetch genres for artists not already cached
+        artist_genres = cache_get_many(cache, all_artist_ids)
+        missing = [aid for aid in all_artist_ids if aid not in artist_genres]
+        print(f"Batch fetching genres from Spotify ({len(missing)} uncached)...")
+        for aid, genres in get_genres_for_artist_ids(sp, missing, args.workers).items():
             cache_put(cache, aid, genres)
+            artist_genres[aid] = genres
         
-        # Apply genres to artist stats
-        for artist_id, stats in artist_stats.items():
-            genres = batch_results.get(artist_id, [])
+        # Resolve each artist's genre text
+        genre_text = {}
+        for artist_id, artist_name in artist_names.items():
+            genres = list(artist_genres.get(artist_id) or [])
             
             # Try alias if no Spotify genres
             if not genres:
-                genres = genres_from_alias(stats['artist_name'])
+                genres = genres_from_alias(artist_name)
             
             # Try name signals if still empty
             if not genres:
-                genres = name_signal_genres(stats['artist_name'])
+                genres = name_signal_genres(artist_name)
             
             # Use unknown if still empty
             if not genres:
                 genres = ['unknown']
             
-            stats['genres'] = ', '.join(genres)
+            genre_text[artist_id] = ', '.join(genres)
         
         # Save updated cache
         save_cache(cache, args.cache)
         
-        # Convert to list for CSV export
-        artist_summary = list(artist_stats.values())
-        
-        # Sort by song count (highest first)
-        artist_summary.sort(key=lambda x: x['song_count'], reverse=True)
-        
-        # Export to CSV
+        # Export to CSV, sorted by song count (highest first; most_common keeps first-seen order for ties)
         export_path = args.csv.replace('.csv', '_artist_summary.csv')
         with open(export_path, 'w', encoding='utf-8', newline='') as f:
-            if artist_summary:
+            if song_counts:
                 fieldnames = ['artist_name', 'genres', 'song_count', 'favorite_artist', 'artist_id']
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
-                writer.writerows(artist_summary)
+                writer.writerows({
+                    'artist_name': artist_names[artist_id],
+                    'genres': genre_text[artist_id],
+                    'song_count': count,
+                    'favorite_artist': 'NO',  # User can edit this in CSV
+                    'artist_id': artist_id
+                } for artist_id, count in song_counts.most_common())
         
         print(f"Exported artist summary: {export_path}")
-        print(f"Found {len(artist_summary)} unique artists")
+        print(f"Found {len(song_counts)} unique artists")
         print("You can edit the 'favorite_artist' column to mark your favorites (YES/NO/REMOVE)")
         return
         
@@ -756,13 +1337,15 @@ def main():
         for action in artist_actions:
             print(f"  - {action['action']}: {action['artist_name']}")
         
-        # Get current liked songs for comparison
+        # Get current liked songs for comparison; one pass also indexes them by artist for REMOVE
         print("\nFetching current liked songs...")
-        current_liked = set()
-        for item in paginate_saved_tracks(sp):
-            track = item.get("track")
-            if track and track.get("id"):
-                current_liked.add(track["id"])
+        liked_tracks = [item["track"] for item in paginate_saved_tracks(sp, workers=args.workers)
+                        if item.get("track") and item["track"].get("id")]
+        current_liked = {track["id"] for track in liked_tracks}
+        artist_to_tracks: Dict[str, Set[str]] = defaultdict(set)
+        for track in liked_tracks:
+            for a in track.get("artists", []):
+                artist_to_tracks[a.get("id")].add(track["id"])
         
         print(f"Current liked songs: {len(current_liked)}")
         
@@ -792,144 +1375,93 @@ def main():
                 
                 if new_tracks:
                     print(f"  Adding {len(new_tracks)} new tracks...")
-                    # Add in batches of 50 (Spotify API limit)
-                    for batch_start in range(0, len(new_tracks), 50):
-                        batch = new_tracks[batch_start:batch_start + 50]
-                        try:
-                            sp.current_user_saved_tracks_add(batch)
+                    # Add in batches of 50 (Spotify API limit); liked-song order doesn't matter, so batches run concurrently
+                    for batch, err in run_batches(sp.current_user_saved_tracks_add, new_tracks, 50, args.workers):
+                        if err:
+                            print(f"    Error adding batch: {err}")
+                        else:
                             print(f"    Added batch of {len(batch)} tracks")
-                        except Exception as e:
-                            print(f"    Error adding batch: {e}")
-                        time.sleep(0.1)
                     
                     # Update our current_liked set
                     current_liked.update(new_tracks)
+                    for track in all_tracks:
+                        if track.get('id'):
+                            for a in track.get("artists", []):
+                                artist_to_tracks[a.get("id")].add(track['id'])
                 else:
                     print("  No new tracks to add (already have all)")
                     
             elif action_type == 'REMOVE':
                 # Remove all songs from this artist
                 print("  Finding tracks to remove...")
-                tracks_to_remove = []
-                
-                for item in paginate_saved_tracks(sp):
-                    track = item.get("track")
-                    if not track or not track.get("id"):
-                        continue
-                    
-                    # Check if any artist on this track matches
-                    for artist in track.get("artists", []):
-                        if artist.get("id") == artist_id:
-                            tracks_to_remove.append(track["id"])
-                            break
+                tracks_to_remove = [tid for tid in artist_to_tracks.get(artist_id, ()) if tid in current_liked]
                 
                 if tracks_to_remove:
                     print(f"  Removing {len(tracks_to_remove)} tracks...")
                     # Remove in batches of 50
-                    for batch_start in range(0, len(tracks_to_remove), 50):
-                        batch = tracks_to_remove[batch_start:batch_start + 50]
-                        try:
-                            sp.current_user_saved_tracks_delete(batch)
+                    for batch, err in run_batches(sp.current_user_saved_tracks_delete, tracks_to_remove, 50, args.workers):
+                        if err:
+                            print(f"    Error removing batch: {err}")
+                        else:
                             print(f"    Removed batch of {len(batch)} tracks")
-                        except Exception as e:
-                            print(f"    Error removing batch: {e}")
-                        time.sleep(0.1)
                     
                     # Update our current_liked set
                     current_liked.difference_update(tracks_to_remove)
                 else:
                     print("  No tracks found to remove")
-            
-            time.sleep(0.5)  # Be nice to API between artists
         
         print(f"\nProcessing complete! Final liked songs count: {len(current_liked)}")
         return
 
-    def paginate_playlist_tracks(playlist_id: str, limit=100, max_items=0):
-        offset = 0
-        got = 0
-        while True:
-            res = sp.playlist_items(playlist_id, limit=limit, offset=offset)
-            items = res.get("items", [])
-            if not items:
-                break
-            for it in items:
-                yield it
-                got += 1
-                if max_items and got >= max_items:
-                    return
-            offset += len(items)
+    def paginate_playlist_tracks(playlist_id: str, limit=100, max_items=0,
+                                 fields="items(track(id,name,album(name),artists(id,name))),total"):
+        # Only the track fields the genre report uses are requested; pages past the first come in concurrently
+        pages = fetch_pages(lambda off: sp.playlist_items(playlist_id, fields=fields, limit=limit, offset=off),
+                            limit, args.workers, max_items)
+        items = (it for page in pages for it in page.get("items", []))
+        yield from itertools.islice(items, max_items or None)
 
     def extract_playlist_id(s: str) -> str:
         s = s.strip()
-        if s.startswith("spotify:playlist:"):
-            return s.split(":")[-1]
-        if "open.spotify.com/playlist/" in s:
-            return s.split("playlist/")[-1].split("?")[0]
-        return s
+        m = _PLAYLIST_RE.search(s)
+        return m.group(1) if m else s
 
-    def parse_setlist_file(file_path: str) -> List[Tuple[str, str]]:
-        """Parse setlist file. Format: 'Artist Name: Song Title' per line"""
-        setlist = []
+    def read_entry_lines(file_path: str, label: str) -> List[Tuple[int, str]]:
+        """(line number, text) for the non-blank, non-comment lines of a list file, read in one go"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    if ': ' in line:
-                        artist, song = line.split(': ', 1)
-                        setlist.append((artist.strip(), song.strip()))
-                    else:
-                        print(f"WARNING: Line {line_num} doesn't match format 'Artist: Song' - skipping: {line}")
+                lines = f.read().split('\n')
         except FileNotFoundError:
-            print(f"ERROR: Setlist file not found: {file_path}", file=sys.stderr)
+            print(f"ERROR: {label.capitalize()} file not found: {file_path}", file=sys.stderr)
             sys.exit(2)
         except Exception as e:
-            print(f"ERROR: Failed to read setlist file: {e}", file=sys.stderr)
+            print(f"ERROR: Failed to read {label} file: {e}", file=sys.stderr)
             sys.exit(2)
-        return setlist
+        stripped = (line.strip() for line in lines)
+        return [(n, line) for n, line in enumerate(stripped, 1) if line and not line.startswith('#')]
+
+    def split_entry_pairs(lines: List[Tuple[int, str]], right: str) -> List[Tuple[str, str]]:
+        """Split 'Artist: <right>' lines, warning about (and skipping) lines without the separator"""
+        pairs = []
+        for line_num, line in lines:
+            artist, sep, rest = line.partition(': ')
+            if sep:
+                pairs.append((artist.strip(), rest.strip()))
+            else:
+                print(f"WARNING: Line {line_num} doesn't match format 'Artist: {right}' - skipping: {line}")
+        return pairs
+
+    def parse_setlist_file(file_path: str) -> List[Tuple[str, str]]:
+        """Parse setlist file. Format: 'Artist Name: Song Title' per line"""
+        return split_entry_pairs(read_entry_lines(file_path, "setlist"), "Song")
 
     def parse_albums_file(file_path: str) -> List[Tuple[str, str]]:
         """Parse albums file. Format: 'Artist Name: Album Name' per line"""
-        albums = []
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    if ': ' in line:
-                        artist, album = line.split(': ', 1)
-                        albums.append((artist.strip(), album.strip()))
-                    else:
-                        print(f"WARNING: Line {line_num} doesn't match format 'Artist: Album' - skipping: {line}")
-        except FileNotFoundError:
-            print(f"ERROR: Albums file not found: {file_path}", file=sys.stderr)
-            sys.exit(2)
-        except Exception as e:
-            print(f"ERROR: Failed to read albums file: {e}", file=sys.stderr)
-            sys.exit(2)
-        return albums
+        return split_entry_pairs(read_entry_lines(file_path, "albums"), "Album")
 
     def parse_favorite_artists_file(file_path: str) -> List[str]:
         """Parse favorite artists file. Format: one artist name per line"""
-        artists = []
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        artists.append(line)
-        except FileNotFoundError:
-            print(f"ERROR: Favorite artists file not found: {file_path}", file=sys.stderr)
-            sys.exit(2)
-        except Exception as e:
-            print(f"ERROR: Failed to read favorite artists file: {e}", file=sys.stderr)
-            sys.exit(2)
-        return artists
+        return [line for _, line in read_entry_lines(file_path, "favorite artists")]
 
     def search_track(sp, artist: str, song: str) -> Tuple[Optional[dict], str]:
         """Search for a specific track by artist and song name. Returns (track, status)"""
@@ -994,20 +1526,32 @@ def main():
     tracks = []
     if args.liked:
         print("Fetching Liked Songs...")
-        for item in paginate_saved_tracks(sp, max_items=args.max):
+        for item in paginate_saved_tracks(sp, max_items=args.max, workers=args.workers):
             tr = item.get("track") or {}
             if not tr or not tr.get("id"):
                 continue
             tracks.append(tr)
     elif args.playlist:
         pid = extract_playlist_id(args.playlist)
-        meta = sp.playlist(pid, fields="name,owner(id),id")
+        meta = sp.playlist(pid, fields="name,owner(id),id,snapshot_id")
         print(f"Fetching playlist: {meta.get('name')} ({pid})")
-        for item in paginate_playlist_tracks(pid, max_items=args.max):
-            tr = item.get("track") or {}
-            if not tr or not tr.get("id"):
-                continue
-            tracks.append(tr)
+        # The contents only change with the snapshot_id, so an unchanged playlist is read from the
+        # cache ("playlist_items:<id>") instead of paging through it again
+        items_key = "playlist_items:" + pid
+        snapshot_id = meta.get("snapshot_id")
+        ent = cache.get(items_key)
+        if snapshot_id and isinstance(ent, dict) and ent.get("snapshot_id") == snapshot_id and not cache_expired(ent):
+            cached_tracks = ent.get("tracks", [])
+            tracks.extend(cached_tracks[:args.max] if args.max else cached_tracks)
+        else:
+            for item in paginate_playlist_tracks(pid, max_items=args.max):
+                tr = item.get("track") or {}
+                if not tr or not tr.get("id"):
+                    continue
+                tracks.append(tr)
+            if snapshot_id and not args.max:
+                cache[items_key] = {"snapshot_id": snapshot_id, "tracks": list(tracks), "ts": time.time(), "source": "playlist"}
+                save_cache(cache, args.cache)
     elif args.setlist_file:
         if not args.validate_only and not args.concert_playlist:
             print("ERROR: --concert-playlist name required when using --setlist-file (unless using --validate-only)", file=sys.stderr)
@@ -1022,9 +1566,29 @@ def main():
         found_tracks = []
         validation_results = []
         
+        # Results are cached under "track_search:<artist>|<song>"; repeated lines and songs
+        # seen on earlier runs skip the two searches. The misses run on the worker pool.
+        searched = {}
+        pending = {}
+        for artist, song in setlist:
+            key = f"track_search:{norm(artist)}|{norm(song)}"
+            ent = cache.get(key)
+            if isinstance(ent, dict) and not cache_expired(ent):
+                searched[key] = (ent.get("track"), ent.get("status", "not_found"))
+            else:
+                pending.setdefault(key, (artist, song))
+        results = parallel_map(lambda pair: search_track(sp, *pair), pending.values(), args.workers)
+        for key, (track, status) in zip(pending, results):
+            # Slimmed here too, so a first run and a cached run work from the same fields
+            track = slim_track(track) if track else track
+            searched[key] = (track, status)
+            if not status.startswith("error"):
+                cache[key] = {"track": track, "status": status, "ts": time.time(), "source": "search" if track else "empty"}
+        save_cache(cache, args.cache)
+        
         for i, (artist, song) in enumerate(setlist, 1):
+            track, status = searched[f"track_search:{norm(artist)}|{norm(song)}"]
             print(f"[{i:2d}/{len(setlist)}] Searching: {artist} - {song}")
-            track, status = search_track(sp, artist, song)
             
             result = {
                 'original_artist': artist,
@@ -1050,7 +1614,6 @@ def main():
                 print(f"         ✗ NOT FOUND ({status})")
                 
             validation_results.append(result)
-            time.sleep(0.1)  # Be nice to Spotify API
         
         # Print summary
         print("\n" + "=" * 80)
@@ -1094,7 +1657,7 @@ def main():
             description=f"Setlist playlist with {len(found_tracks)} songs ({(len(found_tracks)/len(setlist)*100):.1f}% match rate)"
         )
         
-        # Add tracks to concert playlist
+        # Add tracks to concert playlist; chunks go in one at a time so the setlist keeps its order
         track_ids = [t['id'] for t in found_tracks]
         for chunk in chunked(track_ids, 100):
             sp.playlist_add_items(concert_pl['id'], chunk)
@@ -1111,13 +1674,16 @@ def main():
         print(f"Searching for {len(albums_to_add)} albums...")
         found_tracks = []
         
-        for artist, album_name in albums_to_add:
+        def fetch_album(pair):
+            album = search_album(sp, *pair)
+            return album, (get_album_tracks(sp, album['id']) if album else [])
+        
+        fetched = parallel_imap(fetch_album, albums_to_add, args.workers)
+        for (artist, album_name), (album, album_tracks) in zip(albums_to_add, fetched):
             print(f"  Searching: {artist} - {album_name}")
-            album = search_album(sp, artist, album_name)
             
             if album:
                 print(f"    Found album: {album['name']} ({album['release_date'][:4]})")
-                album_tracks = get_album_tracks(sp, album['id'])
                 print(f"    Adding {len(album_tracks)} tracks")
                 
                 # Convert album tracks to full track objects for compatibility
@@ -1126,8 +1692,6 @@ def main():
                         found_tracks.append(track)
             else:
                 print(f"    Album not found: {artist} - {album_name}")
-            
-            time.sleep(0.1)
         
         tracks.extend(found_tracks)
         print(f"Found {len(found_tracks)} tracks from albums")
@@ -1138,6 +1702,7 @@ def main():
         
         print(f"Getting all albums for {len(favorite_artists)} favorite artists...")
         found_tracks = []
+        seen_album_ids = set()  # albums shared by several favorites (collaborations, compilations) are added once
         
         for artist_name in favorite_artists:
             print(f"  Searching for artist: {artist_name}")
@@ -1154,18 +1719,21 @@ def main():
             print(f"    Found artist: {artists[0]['name']}")
             
             # Get all their albums
-            albums = get_artist_albums(sp, artist_id)
+            albums = get_artist_albums(sp, artist_id, args.workers)
             print(f"    Found {len(albums)} albums")
             
+            new_albums = []
+            for album in albums:
+                if album['id'] not in seen_album_ids:
+                    seen_album_ids.add(album['id'])
+                    new_albums.append(album)
+            albums = new_albums
+            album_tracks = get_album_tracks_cached(sp, [al['id'] for al in albums], cache, args.workers)
             for album in albums:
                 album_name = album.get('name', '')
                 print(f"      Adding album: {album_name}")
-                
-                album_tracks = get_album_tracks(sp, album['id'])
-                found_tracks.extend([t for t in album_tracks if t.get('id')])
-                time.sleep(0.1)
-            
-            time.sleep(0.2)  # Extra delay between artists
+                found_tracks.extend([t for t in album_tracks[album['id']] if t.get('id')])
+        save_cache(cache, args.cache)
         
         tracks.extend(found_tracks)
         print(f"Found {len(found_tracks)} tracks from favorite artists")
@@ -1174,200 +1742,177 @@ def main():
         print("ERROR: Choose one of --liked, --playlist <id/url/uri>, --setlist-file <file>, --export-artists, --add-albums <file>, or --favorite-artists <file>", file=sys.stderr)
         sys.exit(2)
 
-    cache = load_cache(args.cache)  # now using TTL structure
-    user_market = (me.get("country") or None)
-
-    def genres_for_track(sp: spotipy.Spotify, tr: dict, cache: Dict[str, dict]) -> List[Tuple[str, float]]:
-        """Get weighted genres for a track using all fallback methods"""
-        scores = Counter()
-
-        # 1) Spotify direct (weighted by primary/featured)
-        w = weighted_genres_for_track(sp, tr, cache)   # [(genre, score)]
-        for g, s in w:
-            add_weighted(scores, [g], WEIGHTS_SOURCE["spotify_artist"] * s)
-
-        if not scores:
-            # 2) alias by name
-            for a in tr.get("artists", []):
-                add_weighted(scores, genres_from_alias(a.get("name", "")), WEIGHTS_SOURCE["alias"])
-
-        if not scores:
-            # 3) name signals
-            for a in tr.get("artists", []):
-                add_weighted(scores, name_signal_genres(a.get("name", "")), WEIGHTS_SOURCE["name_signal"])
-
-        if not scores and args.infer_related:
-            # 4) related artists (primary only)
-            primary_id = tr.get("artists", [{}])[0].get("id")
-            if primary_id:
-                rel = infer_from_related(sp, primary_id)  # already returns top list
-                add_weighted(scores, rel, WEIGHTS_SOURCE["spotify_related"])
+    # Saved in finally so lookups made before an error or Ctrl-C aren't lost
+    try:
+        user_market = (me.get("country") or None)
 
-        if not scores and args.use_musicbrainz:
-            # 5) MusicBrainz tags
+        def musicbrainz_scores(tr: dict) -> Counter:
+            """5) MusicBrainz tags, the network fallback for tracks nothing else could score"""
+            scores = Counter()
             for a in tr.get("artists", []):
                 aname = a.get("name", "")
                 if aname:
-                    mbid = mb_search_artist(aname)
-                    if mbid:
-                        add_weighted(scores, mb_artist_genres(mbid), WEIGHTS_SOURCE["musicbrainz"])
-                        time.sleep(args.mb_delay)
-
-        # turn scores into sorted list
-        weighted_list = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
-        return weighted_list
-
-    print(f"Collected {len(tracks)} tracks. Getting artist genres (with optimized batch processing)...")
-
-    out_rows = []
-    for tr in tracks:
-        tid = tr.get("id")
-        tname = tr.get("name", "")
-        album = (tr.get("album") or {}).get("name", "")
-        artists = split_artists(tr.get("artists"))
-        primary_id = artists[0][0] if artists else None
-
-        # Get weighted genres using new system
-        weighted = genres_for_track(sp, tr, cache)
-        bucket = bucketize_scored(weighted)
-        genres = [g for g, _ in weighted]  # for CSV
-
-        out_rows.append({
-            "track_id": tid,
-            "track_name": tname,
-            "album": album,
-            "artist_names": ", ".join([a[1] for a in artists]),
-            "primary_artist_id": primary_id or "",
-            "genres_raw": "; ".join(genres),
-            "bucket": bucket
-        })
-
-    save_cache(cache, args.cache)
-
-    save_cache(cache, args.cache)
-
-    by_bucket = defaultdict(list)
-    for r in out_rows:
-        by_bucket[r["bucket"]].append(r["track_id"])
-
-    csv_path = args.csv
-    if out_rows:
-        if args.export_analysis:
-            # Create detailed analysis grouped by artist/album
-            analysis_data = []
-            
-            # Group by artist first
-            by_artist = defaultdict(lambda: defaultdict(list))
-            for row in out_rows:
-                artist_name = row["artist_names"].split(", ")[0]  # Use primary artist
-                album_name = row["album"]
-                by_artist[artist_name][album_name].append(row)
+                    add_weighted(scores, mb_genres_for_name(cache, aname), W_MUSICBRAINZ)
+            return scores
+
+        # The same track can arrive more than once (playlist duplicates, overlapping albums)
+        unique_tracks = {}
+        for tr in tracks:
+            unique_tracks.setdefault(tr["id"], tr)
+        tracks = list(unique_tracks.values())
+
+        print(f"Collected {len(tracks)} tracks. Getting artist genres (with optimized batch processing)...")
+        artist_genres, fetched = prefetch_artist_genres(sp, tracks, cache, args.use_all_artists, args.workers,
+                                                        args.primary_sufficient)
+        if fetched:
+            print(f"Fetched {fetched} uncached artists in {(fetched + 49) // 50} batch calls")
+
+        related = {}
+        if args.infer_related:
+            # Primary artists of tracks still empty after Spotify/alias/name rules (deduped).
+            # An empty direct score implies the primary has no cached genres, so those are never looked up.
+            need = list(dict.fromkeys(
+                tr["artists"][0]["id"] for tr in tracks
+                if tr.get("artists") and tr["artists"][0].get("id")
+                and not direct_genre_scores(tr, artist_genres, args.use_all_artists, args.primary_sufficient)
+            ))
+            if need:
+                print(f"Inferring genres from related artists for {len(need)} artists...")
+                related = dict(zip(need, parallel_map(lambda aid: infer_from_related(sp, aid), need, args.workers)))
+
+        by_bucket = defaultdict(list)
+
+        # Pure-CPU part of classification (may run in worker processes); MusicBrainz stays in this process
+        track_classes = iter_track_classifications(tracks, artist_genres, related, args.use_all_artists, args.processes,
+                                                   primary_sufficient=args.primary_sufficient)
+
+        if args.use_musicbrainz:
+            # Collect the names of tracks nothing else could score and resolve them together up front
+            track_classes = list(track_classes)
+            names = [a.get("name", "") for tr, (weighted, _) in zip(tracks, track_classes) if not weighted
+                     for a in tr.get("artists", []) if a.get("name")]
+            looked_up = prefetch_musicbrainz(cache, names, min(args.workers, MB_WORKERS))
+            if looked_up:
+                print(f"Looked up {looked_up} artists on MusicBrainz")
+
+        def iter_track_rows(with_genres: bool = False):
+            """Classify tracks one at a time, recording bucket membership as rows are produced.
+
+            with_genres yields (row, genres) so callers needn't split genres_raw back apart.
+            """
+            use_musicbrainz = args.use_musicbrainz
+            for tr, (weighted, bucket) in zip(tracks, track_classes):
+                tid = tr.get("id")
+                tname = tr.get("name", "")
+                album = (tr.get("album") or {}).get("name", "")
+                artists = split_artists(tr.get("artists"))
+                primary_id = artists[0][0] if artists else None
+
+                if not weighted and use_musicbrainz:
+                    weighted, bucket = rank_scores(musicbrainz_scores(tr))
+                genres = [g for g, _ in weighted]  # for CSV
+
+                by_bucket[bucket].append(tid)
+                row = TrackRow(tid, tname, album, ", ".join([a[1] for a in artists]), primary_id or "", "; ".join(genres), bucket)
+                yield (row, genres) if with_genres else row
+
+        csv_path = args.csv
+        if tracks:
+            if args.export_analysis:
+                # The analysis groups by artist/album, so it needs every row in memory
+                out_rows = list(iter_track_rows(with_genres=True))
+
+                # Group by artist first; album genre sets and bucket counts are kept up as rows arrive
+                by_artist = defaultdict(dict)
+                for row, genres in out_rows:
+                    artist_name = row.artist_names.split(", ")[0]  # Use primary artist
+                    album = by_artist[artist_name].get(row.album)
+                    if album is None:
+                        album = by_artist[artist_name][row.album] = {"tracks": [], "buckets": Counter(), "genres": set()}
+                    album["tracks"].append(row)
+                    album["buckets"][row.bucket] += 1
+                    album["genres"].update(genres)
             
-            # Create analysis rows
-            for artist_name in sorted(by_artist.keys()):
-                albums = by_artist[artist_name]
+                def iter_analysis_rows(by_artist):
+                    """ARTIST, ALBUM and TRACK AnalysisRows for each artist in name order, one at a time"""
+                    separator = AnalysisRow(*["---"] * len(AnalysisRow._fields))
+                    for artist_name in sorted(by_artist.keys()):
+                        albums = by_artist[artist_name]
                 
-                # Get all genres for this artist across all their songs
-                all_artist_genres = set()
-                total_tracks = 0
+                        # The artist totals are sums of the album stats
+                        all_artist_genres = set().union(*(album["genres"] for album in albums.values()))
+                        artist_genre_counts = Counter()
+                        for album in albums.values():
+                            artist_genre_counts.update(album["buckets"])
+                        total_tracks = sum(artist_genre_counts.values())
                 
-                for album_name in sorted(albums.keys()):
-                    tracks = albums[album_name]
-                    total_tracks += len(tracks)
-                    
-                    for track in tracks:
-                        if track["genres_raw"]:
-                            all_artist_genres.update(track["genres_raw"].split("; "))
+                        # Most common genre for this artist
+                        most_common_genre = artist_genre_counts.most_common(1)[0][0] if artist_genre_counts else "unknown"
                 
-                # Most common genre for this artist
-                artist_genre_counts = Counter()
-                for album_name, tracks in albums.items():
-                    for track in tracks:
-                        artist_genre_counts[track["bucket"]] += 1
+                        # Add artist summary row
+                        yield AnalysisRow(
+                            type="ARTIST",
+                            artist=artist_name,
+                            album=f"--- {len(albums)} albums, {total_tracks} tracks ---",
+                            track_name="",
+                            genres_raw="; ".join(sorted(all_artist_genres)) if all_artist_genres else "",
+                            most_common_bucket=most_common_genre,
+                            bucket_distribution=", ".join([f"{bucket}({count})" for bucket, count in artist_genre_counts.most_common()]),
+                            track_count=total_tracks
+                        )
                 
-                most_common_genre = artist_genre_counts.most_common(1)[0][0] if artist_genre_counts else "unknown"
-                
-                # Add artist summary row
-                analysis_data.append({
-                    "type": "ARTIST",
-                    "artist": artist_name,
-                    "album": f"--- {len(albums)} albums, {total_tracks} tracks ---",
-                    "track_name": "",
-                    "genres_raw": "; ".join(sorted(all_artist_genres)) if all_artist_genres else "",
-                    "most_common_bucket": most_common_genre,
-                    "bucket_distribution": ", ".join([f"{bucket}({count})" for bucket, count in artist_genre_counts.most_common()]),
-                    "track_count": total_tracks
-                })
-                
-                # Add album rows
-                for album_name in sorted(albums.keys()):
-                    tracks = albums[album_name]
-                    
-                    # Get genres for this album
-                    album_genres = set()
-                    album_buckets = Counter()
+                        # Add album rows
+                        for album_name in sorted(albums.keys()):
+                            album = albums[album_name]
+                            tracks, album_genres, album_buckets = album["tracks"], album["genres"], album["buckets"]
+                            album_most_common = album_buckets.most_common(1)[0][0] if album_buckets else "unknown"
                     
-                    for track in tracks:
-                        if track["genres_raw"]:
-                            album_genres.update(track["genres_raw"].split("; "))
-                        album_buckets[track["bucket"]] += 1
-                    
-                    album_most_common = album_buckets.most_common(1)[0][0] if album_buckets else "unknown"
-                    
-                    analysis_data.append({
-                        "type": "ALBUM",
-                        "artist": "",
-                        "album": album_name,
-                        "track_name": f"--- {len(tracks)} tracks ---",
-                        "genres_raw": "; ".join(sorted(album_genres)) if album_genres else "",
-                        "most_common_bucket": album_most_common,
-                        "bucket_distribution": ", ".join([f"{bucket}({count})" for bucket, count in album_buckets.most_common()]),
-                        "track_count": len(tracks)
-                    })
+                            yield AnalysisRow(
+                                type="ALBUM",
+                                artist="",
+                                album=album_name,
+                                track_name=f"--- {len(tracks)} tracks ---",
+                                genres_raw="; ".join(sorted(album_genres)) if album_genres else "",
+                                most_common_bucket=album_most_common,
+                                bucket_distribution=", ".join([f"{bucket}({count})" for bucket, count in album_buckets.most_common()]),
+                                track_count=len(tracks)
+                            )
                     
-                    # Add individual tracks
-                    for track in sorted(tracks, key=lambda x: x["track_name"]):
-                        analysis_data.append({
-                            "type": "TRACK",
-                            "artist": "",
-                            "album": "",
-                            "track_name": track["track_name"],
-                            "genres_raw": track["genres_raw"],
-                            "most_common_bucket": track["bucket"],
-                            "bucket_distribution": track["bucket"],
-                            "track_count": 1
-                        })
+                            # Add individual tracks
+                            for track in sorted(tracks, key=lambda x: x.track_name):
+                                yield AnalysisRow(
+                                    type="TRACK",
+                                    artist="",
+                                    album="",
+                                    track_name=track.track_name,
+                                    genres_raw=track.genres_raw,
+                                    most_common_bucket=track.bucket,
+                                    bucket_distribution=track.bucket,
+                                    track_count=1
+                                )
                 
-                # Add separator row
-                analysis_data.append({
-                    "type": "---",
-                    "artist": "---",
-                    "album": "---", 
-                    "track_name": "---",
-                    "genres_raw": "---",
-                    "most_common_bucket": "---",
-                    "bucket_distribution": "---",
-                    "track_count": "---"
-                })
+                        # Add separator row
+                        yield separator
             
-            # Write analysis CSV
-            analysis_path = args.csv.replace('.csv', '_analysis.csv')
-            with open(analysis_path, "w", encoding="utf-8", newline="") as f:
-                fieldnames = ["type", "artist", "album", "track_name", "genres_raw", "most_common_bucket", "bucket_distribution", "track_count"]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(analysis_data)
-            print(f"Wrote detailed analysis: {analysis_path}")
+                # Write analysis CSV, streaming rows as they're built
+                analysis_path = args.csv.replace('.csv', '_analysis.csv')
+                with open(analysis_path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(AnalysisRow._fields)
+                    writer.writerows(iter_analysis_rows(by_artist))
+                print(f"Wrote detailed analysis: {analysis_path}")
             
+            else:
+                # Regular CSV export, streamed so only by_bucket is kept in memory
+                with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(TrackRow._fields)
+                    writer.writerows(iter_track_rows())
+                print(f"Wrote report: {csv_path}")
         else:
-            # Regular CSV export
-            with open(csv_path, "w", encoding="utf-8", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
-                writer.writeheader()
-                writer.writerows(out_rows)
-            print(f"Wrote report: {csv_path}")
-    else:
-        print("No rows to write.")
+            print("No rows to write.")
+    finally:
+        save_cache(cache, args.cache)
 
     if args.dry_run or args.export_analysis:
         if args.export_analysis:
@@ -1379,95 +1924,123 @@ def main():
                 print(f"  {b}: {len(tids)}")
         return
 
-    existing = {}
-    limit = 50
-    offset = 0
-    while True:
-        pls = sp.current_user_playlists(limit=limit, offset=offset)
-        items = pls.get("items", [])
-        for p in items:
-            existing[p["name"]] = p
-        if len(items) < limit:
-            break
-        offset += len(items)
-
     created = []
     updated = []
-
-    for bucket, tids in by_bucket.items():
+    snapshots = load_playlist_snapshots(args.playlist_cache)
+
+    # Listing every playlist just to find ours by name can be the slow part of startup for big
+    # libraries, so the name -> id map is kept in the playlist cache under "owner:<id>" and
+    # reused when cached_playlist_listing says that is cheaper.
+    listing_key = f"owner:{owner_id}"
+    listing = cached_playlist_listing(snapshots, owner_id, len(by_bucket), args.playlist_list_ttl)
+    listing_cached = listing is not None
+    if listing_cached:
+        existing = {name: {"id": pid, "name": name} for name, pid in listing.get("playlists", {}).items()}
+    else:
+        existing = {}
+        pages = fetch_pages(lambda off: sp.current_user_playlists(limit=50, offset=off), 50, args.workers)
+        for pls in pages:
+            for p in pls.get("items", []):
+                existing[p["name"]] = p
+        listing = snapshots[listing_key] = {"ts": time.time(), "pages": len(pages),
+                                            "playlists": {n: p["id"] for n, p in existing.items()}}
+
+    def update_bucket_playlist(item):
+        """Create/refresh one bucket's playlist; returns (name, created, total, added, pid, snapshot, log lines)"""
+        bucket, tids = item
+        log = []
         name = f"{args.prefix}{bucket}"
         pl = existing.get(name)
-        if not pl:
+        if pl and listing_cached:
+            # Deleting a playlist in Spotify only unfollows it (it still answers 200), so check the
+            # owner still follows it before fetching the snapshot_id the cached map doesn't have
+            try:
+                if (sp.playlist_is_following(pl["id"], [owner_id]) or [False])[0]:
+                    pl = dict(pl, snapshot_id=sp.playlist(pl["id"], fields="snapshot_id").get("snapshot_id"))
+                else:
+                    pl = None
+            except SpotifyException as e:
+                if e.http_status != 404:
+                    raise
+                pl = None
+        was_created = not pl
+        if was_created:
             pl = sp.user_playlist_create(owner_id, name, public=args.public, description="Auto-generated by spotify_genre_playlister.py")
-            print(f"Created playlist: {name}")
-            created.append(name)
+            log.append(f"Created playlist: {name}")
         else:
-            print(f"Using existing playlist: {name}")
+            log.append(f"Using existing playlist: {name}")
         pid = pl["id"]
+        snapshot_id = pl.get("snapshot_id")
+        cached = snapshots.get(pid) or {}
+
+        if was_created:
+            # Just created, so there is nothing to read back
+            existing_ids = set()
+        elif snapshot_id and cached.get("snapshot_id") == snapshot_id:
+            # Unchanged since we last wrote it - reuse the stored contents
+            existing_ids = set(cached.get("track_ids", []))
+        else:
+            existing_ids = fetch_playlist_track_ids(sp, pid, args.workers)
 
         if args.clear:
-            current_items = []
-            poff = 0
-            while True:
-                res = sp.playlist_items(pid, fields="items(track(id)),total,next", offset=poff, limit=100)
-                its = res.get("items", [])
-                if not its:
-                    break
-                ids = [it["track"]["id"] for it in its if it.get("track") and it["track"].get("id") ]
-                current_items.extend(ids)
-                if len(its) < 100:
-                    break
-                poff += len(its)
-            for ch in chunked(current_items, 100):
-                sp.playlist_remove_all_occurrences_of_items(pid, ch)
-            print(f"Cleared playlist: {name}")
-
-        existing_ids = set()
-        poff = 0
-        while True:
-            res = sp.playlist_items(pid, fields="items(track(id)),total,next", offset=poff, limit=100)
-            its = res.get("items", [])
-            for it in its:
-                t = it.get("track") or {}
-                if t.get("id"):
-                    existing_ids.add(t["id"])
-            if len(its) < 100:
-                break
-            poff += len(its)
-
-        to_add = [t for t in tids if t not in existing_ids]
+            # Rebuild as a diff: drop only the tracks that no longer belong, keep the rest in place
+            keep = set(tids)
+            to_remove = [t for t in existing_ids if t not in keep]
+            for ch in chunked(to_remove, 100):
+                res = sp.playlist_remove_all_occurrences_of_items(pid, ch)
+                snapshot_id = (res or {}).get("snapshot_id") or snapshot_id
+            existing_ids.difference_update(to_remove)
+            log.append(f"Refreshed playlist: {name} (removed {len(to_remove)} tracks no longer in this bucket)")
+
+        def iter_new_ids():
+            """Bucket ids not yet in the playlist, in order; marking each as seen drops repeats"""
+            for t in tids:
+                if t not in existing_ids:
+                    existing_ids.add(t)
+                    yield t
+
+        # Filtered lazily into 100-id requests rather than building a copy of the bucket first
         added = 0
-        for ch in chunked(to_add, 100):
-            sp.playlist_add_items(pid, ch)
+        for ch in chunked(iter_new_ids(), 100):
+            res = sp.playlist_add_items(pid, ch)
+            snapshot_id = (res or {}).get("snapshot_id") or snapshot_id
             added += len(ch)
 
-        updated.append((name, len(tids), added))
+        snapshot = {"snapshot_id": snapshot_id, "track_ids": sorted(existing_ids)}
+        return name, was_created, len(tids), added, pid, snapshot, log
+
+    # Each bucket's playlist is independent, so they're updated on the worker pool. Adds within
+    # one playlist stay sequential to keep track order; with fewer workers than buckets
+    # (e.g. --workers 4 for 7 buckets) the biggest buckets go first so the longest chain of adds
+    # isn't queued behind small ones. Log lines come back per bucket and go out in one write,
+    # largest bucket first like the dry-run counts, so output from different threads doesn't interleave.
+    results = parallel_map(update_bucket_playlist, sorted(by_bucket.items(), key=lambda kv: -len(kv[1])), args.workers)
+    if results:
+        print("\n".join(line for res in results for line in res[-1]))
+    for name, was_created, total, added, pid, snapshot, log in results:
+        if was_created:
+            created.append(name)
+            # Replaces the entry of a playlist that was deleted since the map was saved
+            listing["playlists"][name] = pid
+            listing["ts"] = time.time()
+        snapshots[pid] = snapshot
+        updated.append((name, total, added))
 
-    print("Done creating/updating playlists.")
-    for name, total, added in updated:
-        print(f"  {name}: total bucket tracks={total}, newly added={added}")
+    save_cache(snapshots, args.playlist_cache)
+
+    print("\n".join(["Done creating/updating playlists."]
+                    + [f"  {name}: total bucket tracks={total}, newly added={added}" for name, total, added in updated]))
     if created:
         print(f"Created playlists: {', '.join(created)}")
 
     # Print error summary
-    all_errors = []
-    for func in [get_artist_genres_by_id, search_artist_genres_by_name, infer_from_related, get_artist_albums, get_album_tracks]:
-        if hasattr(func, '_errors'):
-            all_errors.extend(func._errors)
+    all_errors = [error for errors in API_ERRORS.values() for error in errors]
     
     if all_errors:
         print(f"\nAPI Issues Summary ({len(all_errors)} total):")
         
         # Group by error type
-        error_counts = {}
-        for error in all_errors:
-            if "404" in error:
-                error_type = "404 Not Found"
-            elif "not found" in error.lower():
-                error_type = "Artist Not Found"
-            else:
-                error_type = "Other API Error"
-            error_counts[error_type] = error_counts.get(error_type, 0) + 1
+        error_counts = Counter(map(error_kind, all_errors))
         
         for error_type, count in error_counts.items():
             print(f"  {error_type}: {count}")
@@ -0,0 +1,23 @@
+import spotify_genre_playlister as sgp
+
+NOW = 1_000_000.0
+
+
+def snapshots(pages, age=60):
+    return {"owner:me": {"ts": NOW - age, "pages": pages, "playlists": {"Genres – rock": "pl1"}}}
+
+
+def test_large_fresh_listing_is_reused():
+    listing = sgp.cached_playlist_listing(snapshots(pages=20), "me", buckets=7, ttl=3600, now=NOW)
+    assert listing["playlists"] == {"Genres – rock": "pl1"}
+
+
+def test_small_library_lists_again():
+    # 14 pages cost no more to relist than 7 buckets' follow + snapshot checks
+    assert sgp.cached_playlist_listing(snapshots(pages=14), "me", buckets=7, ttl=3600, now=NOW) is None
+
+
+def test_expired_or_disabled_listing_is_ignored():
+    assert sgp.cached_playlist_listing(snapshots(pages=20, age=7200), "me", buckets=7, ttl=3600, now=NOW) is None
+    assert sgp.cached_playlist_listing(snapshots(pages=20), "me", buckets=7, ttl=0, now=NOW) is None
+    assert sgp.cached_playlist_listing(snapshots(pages=20), "someone-else", buckets=7, ttl=3600, now=NOW) is None
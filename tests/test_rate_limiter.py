@@ -0,0 +1,35 @@
+import threading
+
+import spotify_genre_playlister as sgp
+
+
+def test_concurrent_429s_halve_the_limit_once():
+    limiter = sgp.WindowRateLimiter(150, 30)
+    start = threading.Barrier(8)
+
+    def hit_429():
+        start.wait()
+        limiter.backoff(1.0)
+
+    threads = [threading.Thread(target=hit_429) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert limiter._limit == 75
+
+
+def test_429s_in_later_windows_keep_halving(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(sgp.time, "monotonic", lambda: clock[0])
+    limiter = sgp.WindowRateLimiter(150, 30)
+
+    limiter.backoff(1.0)
+    clock[0] += 5
+    limiter.backoff(1.0)
+    assert limiter._limit == 75
+
+    clock[0] += 30
+    limiter.backoff(1.0)
+    assert limiter._limit == 37